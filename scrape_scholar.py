@@ -4,48 +4,311 @@ Google Scholar Citation Scraper using official scholarly library
 Scrapes citation data from Google Scholar profile and outputs JSON
 """
 
-from scholarly import scholarly, ProxyGenerator
+from selectolax.lexbor import LexborHTMLParser
+import aiohttp
+import asyncio
+import diskcache
+import httpx
+import itertools
 import json
+import orjson
+import zstandard as zstd
+import random
+import re
+import socket
+import ssl
+import threading
 import time
 import sys
-import signal
 import os
-from functools import wraps
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from tenacity import retry, stop_after_attempt, wait_exponential_jitter, retry_if_exception_type
 
-def timeout(seconds=3600):
-    """Timeout decorator to prevent hanging"""
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            def timeout_handler(signum, frame):
-                raise TimeoutError(f"Function {func.__name__} timed out after {seconds} seconds")
-            
-            old_handler = signal.signal(signal.SIGALRM, timeout_handler)
-            signal.alarm(seconds)
-            
-            try:
-                result = func(*args, **kwargs)
-            finally:
-                signal.alarm(0)
-                signal.signal(signal.SIGALRM, old_handler)
-            
-            return result
-        return wrapper
-    return decorator
+SCHOLAR_HOST = 'scholar.google.com'
+SCHOLAR_URL = f'https://{SCHOLAR_HOST}'
+OUTPUT_FILE = 'gs_data.json'
+SNAPSHOT_FILE = f'{OUTPUT_FILE}.zst'  # Compressed intermediate results
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'  # Format of 'last_updated'
+NUM_THREADS = 10  # Max concurrent publication detail requests
+CACHE_DIR = os.path.expanduser('~/.cache/scrape_scholar')
+CACHE_TTL = 24 * 60 * 60  # Cached HTTP responses expire after 24 hours
+SAVE_INTERVAL = 30  # Minimum seconds between intermediate saves
+MAX_FETCH_ATTEMPTS = 3  # Attempts per publication page, rotating proxies in between
+MAX_PROXY_FAILURES = 3  # Consecutive failures before a proxy is dropped from the pool
+PROXY_CONNECT_TIMEOUT = 5  # Seconds before giving up on an unresponsive free proxy
+PROXY_READ_TIMEOUT = 10  # Seconds of silence tolerated from a proxied connection
+SCRAPE_TIMEOUT = 3600  # 1 hour timeout to prevent hanging
+DNS_NAMESERVERS = ['1.1.1.1', '8.8.8.8']
+DNS_CACHE_TTL = 3600  # Seconds to keep resolved Scholar addresses
+AFFILIATION_KEYWORDS = ('shanghai ai laboratory', 'shanghai ai lab')  # Lowercase
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                  '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+def _write_json(path, data):
+    """Write data as indented UTF-8 JSON, zstd-compressed for .zst paths"""
+    # citations_per_year has int keys
+    if path.endswith('.zst'):
+        payload = zstd.ZstdCompressor(level=3).compress(orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS))
+    else:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    
+    # Write to a temp file and swap it in so readers never see a partial file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+def _read_json(path):
+    """Read a file written by _write_json"""
+    if path.endswith('.zst'):
+        with open(path, 'rb') as f:
+            return orjson.loads(zstd.ZstdDecompressor().decompress(f.read()))
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _saved_data_path():
+    """Most recent saved result: an unfinished run's snapshot if newer, else the last output"""
+    existing = [path for path in (SNAPSHOT_FILE, OUTPUT_FILE) if os.path.exists(path)]
+    if not existing:
+        return None
+    return max(existing, key=os.path.getmtime)
+
+def _remove_snapshot():
+    """Delete the intermediate snapshot once a run has finished with it"""
+    if os.path.exists(SNAPSHOT_FILE):
+        os.remove(SNAPSHOT_FILE)
+
+async def _run_in_daemon_thread(func, *args, **kwargs):
+    """Run a blocking call on a daemon thread and await its result.
+    
+    Unlike asyncio.to_thread, a call abandoned by a timeout is not joined by
+    asyncio.run or at interpreter exit. The thread is not stopped, it keeps
+    running in the background until the process exits.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    
+    def set_outcome(outcome, value):
+        if not future.done():
+            getattr(future, outcome)(value)
+    
+    def worker():
+        try:
+            result, outcome = func(*args, **kwargs), 'set_result'
+        except BaseException as e:
+            result, outcome = e, 'set_exception'
+        try:
+            loop.call_soon_threadsafe(set_outcome, outcome, result)
+        except RuntimeError:
+            pass  # Loop already closed after a timeout
+    
+    threading.Thread(target=worker, daemon=True).start()
+    return await future
+
+def _create_ssl_context():
+    """TLS context shared by the scholarly and aiohttp clients"""
+    # Handshakes are saved by keep-alive connection reuse in each client, not by
+    # TLS session resumption, which neither httpx nor aiohttp performs
+    return ssl.create_default_context()
+
+class RateLimiter:
+    """Async token-bucket rate limiter"""
+    def __init__(self, requests_per_second):
+        self.rate = requests_per_second
+        self.max_tokens = requests_per_second
+        self.tokens = requests_per_second
+        self.last_update = time.monotonic()
+        # Created lazily so the lock binds to the running event loop
+        self.lock = None
+    
+    async def acquire(self):
+        """Take one token, sleeping only when the bucket is empty"""
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+        
+        async with self.lock:
+            now = time.monotonic()
+            elapsed = now - self.last_update
+            self.tokens = min(self.max_tokens, self.tokens + elapsed * self.rate)
+            self.last_update = now
+            
+            if self.tokens < 1:
+                wait_time = (1 - self.tokens) / self.rate
+                await asyncio.sleep(wait_time)
+                self.tokens = 0
+                self.last_update = time.monotonic()
+            else:
+                self.tokens -= 1
+
+def _parse_pub_html(html):
+    """Parse a Scholar publication detail page into pub_data fields"""
+    tree = LexborHTMLParser(html)
+    details = {}
+
+    link = tree.css_first('a.gsc_oci_title_link')
+    if link and link.attributes.get('href'):
+        details['pub_url'] = link.attributes['href']
+
+    # Bib fields are rendered as field/value row pairs
+    fields = {}
+    cited_by_text = ''
+    for row in tree.css('#gsc_oci_table .gs_scl'):
+        field = row.css_first('.gsc_oci_field')
+        value = row.css_first('.gsc_oci_value')
+        if field and value:
+            name = field.text(strip=True).lower()
+            fields[name] = value.text(strip=True)
+            if name == 'total citations':
+                # The cell also holds the #gsc_oci_graph_bars chart, only its first link is the count
+                count_link = value.css_first('a')
+                cited_by_text = count_link.text(strip=True) if count_link else ''
+
+    authors = fields.get('authors') or fields.get('inventors')
+    if authors:
+        details['authors'] = authors
+
+    for venue_field in ('journal', 'conference', 'book', 'source'):
+        if fields.get(venue_field):
+            details['venue'] = fields[venue_field]
+            break
+
+    pub_date = fields.get('publication date', '')
+    if pub_date[:4].isdigit():
+        details['year'] = int(pub_date[:4])
+
+    # "Total citations" reads "Cited by N" above the #gsc_oci_graph_bars chart
+    cited_by = re.fullmatch(r'Cited by (\d+)', cited_by_text)
+    if cited_by:
+        details['citations'] = int(cited_by.group(1))
+
+    return details
+
+def _parse_profile_html(html):
+    """Parse citation stats and the cites-per-year graph from a Scholar profile page"""
+    tree = LexborHTMLParser(html)
+    details = {}
+
+    # Stats table cells: citations, h-index, i10-index, each as (all, since) pairs
+    stats = [cell.text(strip=True) for cell in tree.css('#gsc_rsb_st td.gsc_rsb_std')]
+    for field, value in zip(('total_citations', 'h_index', 'i10_index'), stats[::2]):
+        if value.isdigit():
+            details[field] = int(value)
+
+    # The graph is embedded in the same page as year labels and bar counts.
+    # Years with no citations have no bar, so place each bar by its z-index,
+    # which counts from the rightmost year (as scholarly's _fill_counts does)
+    years = [int(node.text(strip=True)) for node in tree.css('.gsc_g_t') if node.text(strip=True).isdigit()]
+    cites = [0] * len(years)
+    for bar in tree.css('a.gsc_g_a'):
+        z_index = re.search(r'z-index:\s*(\d+)', bar.attributes.get('style') or '')
+        count = bar.css_first('.gsc_g_al')
+        if not z_index or not count or not count.text(strip=True).isdigit():
+            continue
+        position = int(z_index.group(1))
+        if 1 <= position <= len(years):
+            cites[-position] = int(count.text(strip=True))
+    citations_per_year = dict(zip(years, cites))
+    if citations_per_year:
+        details['citations_per_year'] = citations_per_year
+
+    return details
+
+def _use_recent_data():
+    """Check if we should use existing data instead of scraping"""
+    path = _saved_data_path()
+    if path:
+        try:
+            existing_data = _read_json(path)
+            last_updated = existing_data.get('last_updated', '')
+
+            if len(last_updated) == 19:
+                from datetime import datetime, timedelta
+                try:
+                    # Fixed-width TIMESTAMP_FORMAT, slicing skips strptime's format scanner
+                    s = last_updated
+                    last_date = datetime(int(s[0:4]), int(s[5:7]), int(s[8:10]),
+                                         int(s[11:13]), int(s[14:16]), int(s[17:19]))
+                    if datetime.now() - last_date < timedelta(days=7):
+                        print("Found recent data (less than 7 days old), using existing")
+                        return True
+                except ValueError:
+                    pass
+        except Exception as e:
+            print(f"Error checking existing data: {e}")
+    return False
+
+def _load_existing_data():
+    """Load and update timestamp of existing data"""
+    try:
+        data = _read_json(_saved_data_path())
+        data['last_updated'] = time.strftime(TIMESTAMP_FORMAT)
+        data['note'] = 'Using recent existing data'
+        return data
+    except Exception as e:
+        print(f"Error loading existing data: {e}")
+        return None
+
+def _finalize_result(data):
+    """Strip snapshot-only fields and sort publications for the final output"""
+    # Remove scraping progress from final result
+    data.pop('scraping_progress', None)
+    data.pop('sorted', None)
+    
+    # Sort by citation count (descending)
+    data.get('publications', []).sort(key=lambda x: x.get('citations', 0), reverse=True)
+    return data
 
 class GoogleScholarScholarlyScaper:
-    def __init__(self, user_id):
+    def __init__(self, user_id, use_cache=True):
         self.user_id = user_id
         
+        # On-disk HTTP response cache so CI retries skip Google entirely
+        self.cache = None
+        if use_cache:
+            try:
+                self.cache = diskcache.Cache(CACHE_DIR)
+                print(f"Using response cache at {CACHE_DIR}")
+            except Exception as e:
+                print(f"Response cache unavailable, continuing without: {e}")
+        
         # Detect if running in GitHub Actions
         self.is_github_actions = os.environ.get('GITHUB_ACTIONS') == 'true'
         print(f"Running in GitHub Actions: {self.is_github_actions}")
         
+        # Pace publication requests to stay under Scholar's rate threshold
+        self.limiter = RateLimiter(requests_per_second=3 if self.is_github_actions else 10)
+        
+        # One TLS configuration (default CA verification) for all Scholar clients
+        self.ssl_context = _create_ssl_context()
+        self.proxy_enabled = False
+        self._last_save = 0
+        
+        # Pool of exit IPs for publication requests, with consecutive failure counts
+        self.proxies = []
+        self.proxy_failures = Counter()
+        
+        # Warm the resolver cache before the first scholarly request
+        try:
+            socket.getaddrinfo(SCHOLAR_HOST, 443)
+        except OSError as e:
+            print(f"DNS warm-up for {SCHOLAR_HOST} failed: {e}")
+        
         # Setup scholarly with proxy if in CI
         self._setup_scholarly()
+        self._setup_http_session()
+        if self.is_github_actions:
+            self._load_proxy_pool()
     
     def _setup_scholarly(self):
         """Setup scholarly with appropriate configuration"""
+        from scholarly import scholarly, ProxyGenerator
+        
         try:
             # Test basic scholarly functionality first
             print("Testing scholarly library...")
@@ -62,6 +325,7 @@ class GoogleScholarScholarlyScaper:
                 print(f"Free proxy setup result: {success}")
                 if success:
                     scholarly.use_proxy(pg)
+                    self.proxy_enabled = True
                     print("Successfully configured free proxy")
                     return
             except Exception as e:
@@ -78,20 +342,110 @@ class GoogleScholarScholarlyScaper:
             traceback.print_exc()
             print("Continuing without proxy...")
 
-    @timeout(3600)  # 1 hour timeout
-    def get_profile_data(self):
-        """Scrape the profile data using scholarly library"""
+    def _load_proxy_pool(self):
+        """Collect free proxies so concurrent publication requests use different exit IPs"""
         try:
-            # For GitHub Actions, try using existing data if recent
-            if self.is_github_actions and self._use_recent_data():
-                return self._load_existing_data()
+            from fp.fp import FreeProxy  # Installed alongside scholarly
             
+            proxies = FreeProxy().get_proxy_list(repeat=False)
+            self.proxies = [p if '://' in p else f"http://{p}" for p in proxies]
+            print(f"Loaded {len(self.proxies)} proxies for publication requests")
+        except Exception as e:
+            print(f"Could not load proxy pool, using direct connection: {e}")
+    
+    def _record_proxy_result(self, proxy, ok):
+        """Track consecutive failures per proxy and evict proxies that keep failing"""
+        if proxy is None:
+            return
+        
+        if ok:
+            self.proxy_failures.pop(proxy, None)
+            return
+        
+        self.proxy_failures[proxy] += 1
+        if self.proxy_failures[proxy] >= MAX_PROXY_FAILURES and proxy in self.proxies:
+            self.proxies.remove(proxy)
+            print(f"Evicted proxy {proxy} after {MAX_PROXY_FAILURES} failures, {len(self.proxies)} left")
+    
+    def _setup_http_session(self):
+        """Route scholarly requests through one persistent HTTP/2 keep-alive client"""
+        from scholarly import scholarly
+        
+        try:
+            nav = scholarly._Scholarly__nav
+            if not hasattr(nav, '_session1'):
+                print("Unsupported scholarly version, keeping default HTTP session")
+                return
+            
+            if self.proxy_enabled:
+                # The proxied session carries the proxy settings, keep scholarly's own client
+                print("Proxy in use, keeping scholarly's default HTTP session")
+            else:
+                # Keep scholarly's own Accept and user-agent headers
+                session = httpx.Client(
+                    http2=True,
+                    headers=nav._session1.headers,
+                    follow_redirects=True,  # As scholarly's sessions, e.g. for profile ID redirects
+                    timeout=30,
+                    verify=self.ssl_context,
+                    limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=75),
+                )
+                nav._session1 = session
+                nav._session2 = session
+                print("Using persistent HTTP/2 session for scholarly requests")
+            
+            if self.cache is not None:
+                self._add_response_cache(nav._session1)
+                if nav._session2 is not nav._session1:
+                    self._add_response_cache(nav._session2)
+            
+        except Exception as e:
+            print(f"Could not set up HTTP/2 session, keeping default: {e}")
+    
+    def _add_response_cache(self, session):
+        """Serve repeated GETs on a scholarly session from the response cache"""
+        fetch = session.get
+        
+        def cached_get(url, **kwargs):
+            text = self._cache_lookup(str(url))
+            if text is not None:
+                return httpx.Response(200, text=text, request=httpx.Request('GET', url))
+            resp = fetch(url, **kwargs)
+            self._cache_store(str(url), resp.status_code, resp.text)
+            return resp
+        
+        session.get = cached_get
+    
+    def _cache_lookup(self, url):
+        """Return the cached response body for url, or None"""
+        if self.cache is None:
+            return None
+        try:
+            return self.cache.get((self.user_id, url))
+        except Exception as e:
+            print(f"Error reading response cache: {e}")
+            return None
+    
+    def _cache_store(self, url, status, text):
+        """Cache a successful response body; blocked and captcha pages are skipped"""
+        if self.cache is None or status != 200 or 'gs_captcha' in text or 'recaptcha' in text:
+            return
+        try:
+            self.cache.set((self.user_id, url), text, expire=CACHE_TTL)
+        except Exception as e:
+            print(f"Error writing response cache: {e}")
+
+    async def get_profile_data(self):
+        """Scrape the profile data using scholarly library"""
+        from scholarly import scholarly
+        
+        try:
             print("Searching for author by ID...")
             # Search for the author by scholar ID using correct API
             try:
                 # First try with filled=False for faster response
                 print("Attempting search with filled=False...")
-                author = scholarly.search_author_id(self.user_id, filled=False)
+                author = await _run_in_daemon_thread(scholarly.search_author_id, self.user_id, filled=False)
                 print(f"Search result type: {type(author)}")
                 print(f"Search result keys: {list(author.keys()) if isinstance(author, dict) else 'Not a dict'}")
                 print(f"Author name: {author.get('name', 'Unknown') if isinstance(author, dict) else 'N/A'}")
@@ -99,11 +453,11 @@ class GoogleScholarScholarlyScaper:
                 # If that worked but we want more data, we can try filled=True as backup
                 if not author or not isinstance(author, dict):
                     print("First search didn't return expected result, trying filled=True...")
-                    author = scholarly.search_author_id(self.user_id, filled=True)
+                    author = await _run_in_daemon_thread(scholarly.search_author_id, self.user_id, filled=True)
                     print(f"Filled search result type: {type(author)}")
                 elif isinstance(author, dict) and 'publications' not in author:
                     print("Basic search worked but no publications, trying filled=True with publication_limit...")
-                    author = scholarly.search_author_id(self.user_id, filled=True, publication_limit=100)
+                    author = await _run_in_daemon_thread(scholarly.search_author_id, self.user_id, filled=True, publication_limit=100)
                     print(f"Search with publications - keys: {list(author.keys()) if isinstance(author, dict) else 'Not a dict'}")
                     
             except Exception as e:
@@ -111,12 +465,12 @@ class GoogleScholarScholarlyScaper:
                 import traceback
                 traceback.print_exc()
                 print("Trying alternative search method...")
-                return self._try_alternative_search()
+                return await self._try_alternative_search()
             
             if not author:
                 print(f"No author found with ID: {self.user_id}")
                 print("Trying alternative search method...")
-                return self._try_alternative_search()
+                return await self._try_alternative_search()
             
             print(f"Found author: {author.get('name', 'Unknown')}")
             
@@ -127,30 +481,19 @@ class GoogleScholarScholarlyScaper:
             if not is_filled:
                 print("Filling author details...")
                 # Fill in the author's complete details with retry mechanism
-                max_fill_attempts = 3
-                author_filled = None
-                
-                for attempt in range(max_fill_attempts):
-                    try:
-                        if attempt > 0:
-                            print(f"Fill attempt {attempt + 1}/{max_fill_attempts}")
-                            time.sleep(10 * attempt)  # Exponential backoff
-                        
-                        author_filled = scholarly.fill(author)
-                        print("Author details filled successfully")
-                        break
-                        
-                    except Exception as e:
-                        print(f"Error filling author details (attempt {attempt + 1}): {e}")
-                        if attempt == max_fill_attempts - 1:
-                            print("All fill attempts failed, using basic author data")
-                            author_filled = author
+                try:
+                    author_filled = await _run_in_daemon_thread(self._fill_author, author)
+                    print("Author details filled successfully")
+                except Exception as e:
+                    print(f"Error filling author details: {e}")
+                    print("All fill attempts failed, using basic author data")
+                    author_filled = author
             else:
                 print("Author already filled, skipping fill step")
                 author_filled = author
             
             print("Extracting profile information...")
-            profile_data = self._extract_profile_info(author_filled)
+            profile_data = await self._extract_profile_info(author_filled)
             
             # Debug: print author structure
             print("=== DEBUG: Author Object Structure ===")
@@ -163,62 +506,42 @@ class GoogleScholarScholarlyScaper:
             print("=== END DEBUG ===")
             
             print("Extracting publications...")
-            publications = self._extract_publications(author_filled, profile_data)
+            publications = await self._extract_publications(author_filled, profile_data)
             
             # Combine data
             result = {
                 **profile_data,
                 'publications': publications,
-                'last_updated': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'last_updated': time.strftime(TIMESTAMP_FORMAT),
                 'scraper_method': 'scholarly'
             }
             
             return result
             
-        except TimeoutError as e:
-            print(f"Scraping timed out: {e}")
-            return self._fallback_data()
         except Exception as e:
             print(f"Error scraping profile: {e}")
             import traceback
             traceback.print_exc()
             return self._fallback_data()
     
-    def _use_recent_data(self):
-        """Check if we should use existing data instead of scraping"""
-        if os.path.exists('gs_data.json'):
-            try:
-                with open('gs_data.json', 'r', encoding='utf-8') as f:
-                    existing_data = json.load(f)
-                    last_updated = existing_data.get('last_updated', '')
-                    
-                    if last_updated:
-                        from datetime import datetime, timedelta
-                        try:
-                            last_date = datetime.strptime(last_updated, '%Y-%m-%d %H:%M:%S')
-                            if datetime.now() - last_date < timedelta(days=7):
-                                print("Found recent data (less than 7 days old), using existing")
-                                return True
-                        except ValueError:
-                            pass
-            except Exception as e:
-                print(f"Error checking existing data: {e}")
-        return False
-    
-    def _load_existing_data(self):
-        """Load and update timestamp of existing data"""
-        try:
-            with open('gs_data.json', 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                data['last_updated'] = time.strftime('%Y-%m-%d %H:%M:%S')
-                data['note'] = 'Using recent existing data'
-                return data
-        except Exception as e:
-            print(f"Error loading existing data: {e}")
-            return None
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential_jitter(initial=2, max=30),  # Jitter avoids synchronized retries
+        retry=retry_if_exception_type(Exception),
+        before_sleep=lambda state: print(
+            f"Error filling author details (attempt {state.attempt_number}): {state.outcome.exception()}"
+        ),
+        reraise=True,
+    )
+    def _fill_author(self, author):
+        """Fill author details, retrying with jittered exponential backoff"""
+        from scholarly import scholarly
+        
+        return scholarly.fill(author)
     
     def _fallback_data(self):
         """Return fallback data if scraping fails"""
+        now_str = time.strftime(TIMESTAMP_FORMAT)
         fallback = {
             "name": "Yuhang Zang",
             "affiliation": "Shanghai AI Laboratory", 
@@ -230,52 +553,36 @@ class GoogleScholarScholarlyScaper:
             "i10_index": 0,
             "citations_per_year": {},
             "publications": [],
-            "last_updated": time.strftime('%Y-%m-%d %H:%M:%S'),
+            "last_updated": now_str,
             "scraper_method": "scholarly",
             "note": "Fallback data due to scraping failure"
         }
         
         # Try to load existing data first
-        if os.path.exists('gs_data.json'):
+        path = _saved_data_path()
+        if path:
             try:
-                with open('gs_data.json', 'r', encoding='utf-8') as f:
-                    existing_data = json.load(f)
-                    existing_data['last_updated'] = time.strftime('%Y-%m-%d %H:%M:%S')
-                    existing_data['note'] = 'Existing data due to scraping failure'
-                    return existing_data
+                existing_data = _read_json(path)
+                existing_data['last_updated'] = now_str
+                existing_data['note'] = 'Existing data due to scraping failure'
+                return existing_data
             except Exception:
                 pass
         
         return fallback
     
-    def _try_alternative_search(self):
+    async def _try_alternative_search(self):
         """Try alternative search methods when direct ID search fails"""
+        from scholarly import scholarly
+        
         try:
             print("Attempting alternative search by author name...")
             # Try searching by author name (we know this is Yuhang Zang)
-            search_query = scholarly.search_author('Yuhang Zang')
+            search_query = await _run_in_daemon_thread(scholarly.search_author, 'Yuhang Zang')
             
-            # Look for the first few results
-            found_author = None
-            for i, author in enumerate(search_query):
-                if i >= 5:  # Only check first 5 results
-                    break
-                    
-                print(f"Checking author {i+1}: {author.get('name', 'Unknown')} at {author.get('affiliation', 'Unknown')}")
-                
-                # Look for Shanghai AI Laboratory affiliation
-                affiliation = author.get('affiliation', '').lower()
-                if 'shanghai ai laboratory' in affiliation or 'shanghai ai lab' in affiliation:
-                    print(f"Found matching author: {author.get('name')} at {author.get('affiliation')}")
-                    found_author = author
-                    break
-                    
-                # Also check if this might be the right person by name
-                name = author.get('name', '').lower()
-                if 'yuhang zang' in name:
-                    print(f"Found author by name match: {author.get('name')} at {author.get('affiliation')}")
-                    found_author = author
-                    break
+            # Look for the first few results; islice stops the generator from paging further
+            candidates = await _run_in_daemon_thread(list, itertools.islice(search_query, 5))
+            found_author = next((author for author in candidates if self._check_candidate(author)), None)
             
             if not found_author:
                 print("No matching author found in alternative search")
@@ -284,20 +591,20 @@ class GoogleScholarScholarlyScaper:
             # Try to fill the found author
             print("Filling alternative search result...")
             try:
-                author_filled = scholarly.fill(found_author)
+                author_filled = await _run_in_daemon_thread(scholarly.fill, found_author)
             except Exception as e:
                 print(f"Error filling alternative author: {e}")
                 author_filled = found_author
             
             # Extract data
-            profile_data = self._extract_profile_info(author_filled)
-            publications = self._extract_publications(author_filled, profile_data)
+            profile_data = await self._extract_profile_info(author_filled)
+            publications = await self._extract_publications(author_filled, profile_data)
             
             # Combine data
             result = {
                 **profile_data,
                 'publications': publications,
-                'last_updated': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'last_updated': time.strftime(TIMESTAMP_FORMAT),
                 'scraper_method': 'scholarly-alternative',
                 'note': 'Found via alternative name search'
             }
@@ -310,7 +617,25 @@ class GoogleScholarScholarlyScaper:
             traceback.print_exc()
             return self._fallback_data()
     
-    def _extract_profile_info(self, author):
+    def _check_candidate(self, author):
+        """Return True if an alternative search result looks like the target author"""
+        print(f"Checking author: {author.get('name', 'Unknown')} at {author.get('affiliation', 'Unknown')}")
+        
+        # Look for Shanghai AI Laboratory affiliation
+        affiliation = author.get('affiliation', '').lower()
+        if any(keyword in affiliation for keyword in AFFILIATION_KEYWORDS):
+            print(f"Found matching author: {author.get('name')} at {author.get('affiliation')}")
+            return True
+        
+        # Also check if this might be the right person by name
+        name = author.get('name', '').lower()
+        if 'yuhang zang' in name:
+            print(f"Found author by name match: {author.get('name')} at {author.get('affiliation')}")
+            return True
+        
+        return False
+    
+    async def _extract_profile_info(self, author):
         """Extract basic profile information"""
         data = {}
         
@@ -329,13 +654,39 @@ class GoogleScholarScholarlyScaper:
         # Citation stats by year
         data['citations_per_year'] = author.get('cites_per_year', {})
         
+        # An unfilled author (fill failed) has no stats, read them from the profile page
+        if not data['total_citations'] or not data['citations_per_year']:
+            scholar_id = author.get('scholar_id') or self.user_id
+            try:
+                for field, value in (await self._fetch_profile_stats(scholar_id)).items():
+                    if not data.get(field):
+                        data[field] = value
+            except Exception as e:
+                print(f"Error fetching profile stats: {e}")
+        
         print(f"Profile: {data['name']} at {data['affiliation']}")
         print(f"Citations: {data['total_citations']}, H-index: {data['h_index']}, i10-index: {data['i10_index']}")
         
         return data
     
-    def _extract_publications(self, author, profile_data):
+    async def _fetch_profile_stats(self, scholar_id):
+        """Fetch citation stats for scholar_id over a short-lived HTTP/2 client"""
+        url = f"{SCHOLAR_URL}/citations?user={scholar_id}&hl=en"
+        html = self._cache_lookup(url)
+        if html is None:
+            await self.limiter.acquire()
+            async with httpx.AsyncClient(http2=True, headers=HEADERS, timeout=30, verify=self.ssl_context) as client:
+                resp = await client.get(url)
+                resp.raise_for_status()
+                html = resp.text
+            self._cache_store(url, resp.status_code, html)
+        
+        return _parse_profile_html(html)
+    
+    async def _extract_publications(self, author, profile_data):
         """Extract publications with detailed information"""
+        from scholarly import scholarly
+        
         publications = []
         
         print(f"Author object keys: {list(author.keys()) if isinstance(author, dict) else 'Not a dict'}")
@@ -349,7 +700,7 @@ class GoogleScholarScholarlyScaper:
             if not author.get('filled', False):
                 print("Attempting to fill author to get publications...")
                 try:
-                    filled_author = scholarly.fill(author)
+                    filled_author = await _run_in_daemon_thread(scholarly.fill, author)
                     print(f"After fill - keys: {list(filled_author.keys())}")
                     if 'publications' in filled_author:
                         author = filled_author
@@ -364,106 +715,206 @@ class GoogleScholarScholarlyScaper:
                 print("Author is marked as filled but still no publications")
                 return publications
         
-        author_pubs = author['publications']
+        # Merged author profiles can list the same paper twice, keep the first copy.
+        # Entries with neither an id nor a title can't be matched, so all are kept
+        seen_keys = set()
+        author_pubs = []
+        for pub in author['publications']:
+            pub_key = pub.get('author_pub_id') or (pub.get('bib') or {}).get('title', '')
+            if pub_key:
+                if pub_key in seen_keys:
+                    continue
+                seen_keys.add(pub_key)
+            author_pubs.append(pub)
+        
         total_pubs = len(author_pubs)
-        print(f"Found {total_pubs} publications")
+        duplicates = len(author['publications']) - total_pubs
+        print(f"Found {total_pubs} publications" + (f" ({duplicates} duplicates skipped)" if duplicates else ""))
         
-        for i, pub in enumerate(author_pubs):
-            try:
-                print(f"Processing publication {i+1}/{total_pubs}: {pub.get('bib', {}).get('title', 'Unknown')}")
-                
-                # Debug: print publication keys to understand structure
-                if i == 0:  # Only for first publication to avoid spam
-                    print(f"DEBUG: First publication keys: {list(pub.keys())}")
-                    print(f"DEBUG: author_pub_id: {pub.get('author_pub_id', 'NOT FOUND')}")
-                    print(f"DEBUG: gsrank: {pub.get('gsrank', 'NOT FOUND')}")
-                    print(f"DEBUG: container_type: {pub.get('container_type', 'NOT FOUND')}")
-                    print(f"DEBUG: filled: {pub.get('filled', 'NOT FOUND')}")
-                
-                # Extract basic info first
-                pub_data = {
-                    'title': pub.get('bib', {}).get('title', ''),
-                    'authors': pub.get('bib', {}).get('author', ''),
-                    'venue': pub.get('bib', {}).get('venue', ''),
-                    'year': pub.get('bib', {}).get('pub_year'),
-                    'citations': pub.get('num_citations', 0),
-                    'pub_url': pub.get('pub_url', ''),
-                    'key': pub.get('author_pub_id', ''),  # The paper key like 'hW23VKIAAAAJ:u-x6o8ySG0sC'
-                }
+        if author_pubs:
+            # Debug: print publication keys to understand structure
+            first_pub = author_pubs[0]
+            print(f"DEBUG: First publication keys: {list(first_pub.keys())}")
+            print(f"DEBUG: author_pub_id: {first_pub.get('author_pub_id', 'NOT FOUND')}")
+            print(f"DEBUG: gsrank: {first_pub.get('gsrank', 'NOT FOUND')}")
+            print(f"DEBUG: container_type: {first_pub.get('container_type', 'NOT FOUND')}")
+            print(f"DEBUG: filled: {first_pub.get('filled', 'NOT FOUND')}")
+        
+        publications = await self._fetch_publications(author_pubs, profile_data)
+        print(f"Successfully extracted {len(publications)} publications")
+        
+        return publications
+    
+    async def _fetch_publications(self, author_pubs, profile_data):
+        """Fetch publication details concurrently, bounded by a shared semaphore"""
+        total_pubs = len(author_pubs)
+        sem = asyncio.Semaphore(NUM_THREADS)
+        connector = aiohttp.TCPConnector(
+            limit=20,
+            resolver=self._create_resolver(),
+            ttl_dns_cache=DNS_CACHE_TTL,
+            ssl=self.ssl_context,
+            keepalive_timeout=75,
+        )
+        client_timeout = aiohttp.ClientTimeout(total=30)
+        
+        # HTML parsing is CPU-bound, run it in worker processes so fetches keep flowing
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+            async with aiohttp.ClientSession(connector=connector, headers=HEADERS, timeout=client_timeout) as session:
+                tasks = [
+                    asyncio.ensure_future(self._fetch_pub(session, sem, pool, pub, i, total_pubs))
+                    for i, pub in enumerate(author_pubs)
+                ]
                 
-                # Try to get more details if available
+                for done, future in enumerate(asyncio.as_completed(tasks), 1):
+                    await future
+                    
+                    # Save intermediate results periodically
+                    if profile_data and time.monotonic() - self._last_save > SAVE_INTERVAL:
+                        partial = [t.result() for t in tasks if t.done() and t.result()]
+                        self._save_intermediate_result(profile_data, partial, done, total_pubs)
+                        self._last_save = time.monotonic()
+        
+        # Keep the original publication order; failed items come back as None
+        return [t.result() for t in tasks if t.result()]
+    
+    def _create_resolver(self):
+        """Async DNS resolver for the aiohttp connector, None to use aiohttp's default"""
+        try:
+            return aiohttp.AsyncResolver(nameservers=DNS_NAMESERVERS)
+        except Exception as e:
+            # AsyncResolver needs aiodns
+            print(f"Async DNS resolver unavailable, using default: {e}")
+            return None
+    
+    async def _fetch_pub(self, session, sem, pool, pub, index, total):
+        """Build pub_data for one publication, enriched from its Scholar detail page"""
+        try:
+            bib = pub.get('bib') or {}
+            print(f"Processing publication {index+1}/{total}: {bib.get('title', 'Unknown')}")
+            
+            # Extract basic info first
+            pub_data = {
+                'title': bib.get('title', ''),
+                'authors': bib.get('author', ''),
+                'venue': bib.get('venue', ''),
+                'year': bib.get('pub_year'),
+                'citations': pub.get('num_citations', 0),
+                'pub_url': pub.get('pub_url', ''),
+                'key': pub.get('author_pub_id', ''),  # The paper key like 'hW23VKIAAAAJ:u-x6o8ySG0sC'
+            }
+            
+            if not pub_data['venue']:
+                # Try to extract venue from journal or conference
+                pub_data['venue'] = bib.get('journal', bib.get('conference', ''))
+            
+            # Convert year to int if possible
+            if pub_data['year']:
                 try:
-                    if not pub_data['venue'] and 'bib' in pub:
-                        # Try to extract venue from journal or conference
-                        bib = pub['bib']
-                        pub_data['venue'] = bib.get('journal', bib.get('conference', ''))
+                    pub_data['year'] = int(pub_data['year'])
+                except (ValueError, TypeError):
+                    pass
+        except Exception as e:
+            print(f"Error processing publication {index+1}: {e}")
+            return None
+        
+        if not pub_data['key']:
+            return pub_data
+        
+        # Try to get more details from the publication page
+        url = f"{SCHOLAR_URL}/citations?view_op=view_citation&hl=en&citation_for_view={pub_data['key']}"
+        try:
+            html = await self._http_get(session, sem, url)
+            details = await asyncio.get_running_loop().run_in_executor(pool, _parse_pub_html, html)
+            
+            # Only fill fields the listing left empty
+            for field, value in details.items():
+                if value and not pub_data.get(field):
+                    pub_data[field] = value
                     
-                    # Convert year to int if possible
-                    if pub_data['year']:
-                        try:
-                            pub_data['year'] = int(pub_data['year'])
-                        except (ValueError, TypeError):
-                            pass
-                            
-                except Exception as detail_error:
-                    print(f"Error extracting details for publication {i+1}: {detail_error}")
-                
-                publications.append(pub_data)
-                
-                # Save intermediate results periodically
-                if i % 10 == 0 and profile_data:
-                    self._save_intermediate_result(profile_data, publications, i+1, total_pubs)
-                
-                # Add delay to avoid rate limiting
-                delay = 2 if self.is_github_actions else 0.5
-                time.sleep(delay)
-                
-            except Exception as e:
-                print(f"Error processing publication {i+1}: {e}")
-                continue
+        except Exception as detail_error:
+            print(f"Error extracting details for publication {index+1}: {detail_error}")
         
-        # Sort by citation count (descending)
-        publications.sort(key=lambda x: x.get('citations', 0), reverse=True)
-        print(f"Successfully extracted {len(publications)} publications")
+        return pub_data
+    
+    async def _http_get(self, session, sem, url):
+        """GET a Scholar page, served from the response cache when possible"""
+        html = self._cache_lookup(url)
+        if html is not None:
+            return html
         
-        return publications
+        for attempt in range(MAX_FETCH_ATTEMPTS):
+            is_last_attempt = attempt == MAX_FETCH_ATTEMPTS - 1
+            if attempt > 0:
+                await asyncio.sleep(2 ** attempt + random.random())  # Exponential backoff with jitter
+            
+            # The last attempt goes direct in case the whole pool is bad
+            proxy = random.choice(self.proxies) if self.proxies and not is_last_attempt else None
+            
+            # Free proxies are unchecked and often dead, fail fast instead of holding a slot
+            request_kwargs = {}
+            if proxy:
+                request_kwargs['timeout'] = aiohttp.ClientTimeout(
+                    total=30, sock_connect=PROXY_CONNECT_TIMEOUT, sock_read=PROXY_READ_TIMEOUT
+                )
+            try:
+                async with sem:
+                    await self.limiter.acquire()
+                    async with session.get(url, proxy=proxy, **request_kwargs) as resp:
+                        if resp.status in (403, 429) and not is_last_attempt:
+                            print(f"Got HTTP {resp.status} via {proxy or 'direct connection'}, rotating proxy")
+                            self._record_proxy_result(proxy, ok=False)
+                            continue
+                        resp.raise_for_status()
+                        html = await resp.text()
+                        
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if is_last_attempt:
+                    raise
+                print(f"Connection error via {proxy or 'direct connection'}: {e}, rotating proxy")
+                self._record_proxy_result(proxy, ok=False)
+                continue
+            
+            self._record_proxy_result(proxy, ok=True)
+            self._cache_store(url, resp.status, html)
+            return html
     
     def _save_intermediate_result(self, profile_data, publications, current, total):
         """Save intermediate results to avoid data loss"""
         try:
-            sorted_pubs = sorted(publications, key=lambda x: x.get('citations', 0), reverse=True)
-            
+            # Publications are sorted once in _finalize_result, snapshots keep scrape order
             result = {
                 **profile_data,
-                'publications': sorted_pubs,
+                'publications': publications,
+                'sorted': False,
                 'scraping_progress': {
                     'current': current,
                     'total': total,
                     'percentage': round((current / total) * 100, 2)
                 },
-                'last_updated': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'last_updated': time.strftime(TIMESTAMP_FORMAT),
                 'scraper_method': 'scholarly'
             }
             
             # Save to output file
-            with open('gs_data.json', 'w', encoding='utf-8') as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
+            _write_json(SNAPSHOT_FILE, result)
             
             print(f"Saved intermediate result: {current}/{total} publications ({result['scraping_progress']['percentage']}%)")
             
         except Exception as e:
             print(f"Error saving intermediate result: {e}")
 
-    def scrape_all(self):
+    async def scrape_all_async(self):
         """Main scraping method"""
         print(f"Scraping Google Scholar profile using scholarly library: {self.user_id}")
         
-        data = self.get_profile_data()
+        try:
+            data = await asyncio.wait_for(self.get_profile_data(), timeout=SCRAPE_TIMEOUT)
+        except asyncio.TimeoutError:
+            print(f"Scraping timed out after {SCRAPE_TIMEOUT} seconds")
+            data = self._fallback_data()
         if data:
-            # Remove scraping progress from final result
-            if 'scraping_progress' in data:
-                del data['scraping_progress']
-            
+            _finalize_result(data)
             print(f"Successfully scraped {len(data.get('publications', []))} publications")
             return data
         else:
@@ -477,14 +928,21 @@ def main():
         sys.exit(1)
     
     user_id = sys.argv[1]
-    scraper = GoogleScholarScholarlyScaper(user_id)
     
-    data = scraper.scrape_all()
+    # For GitHub Actions, try using existing data if recent; this skips importing scholarly
+    if os.environ.get('GITHUB_ACTIONS') == 'true' and _use_recent_data():
+        data = _load_existing_data()
+        if data:
+            _finalize_result(data)
+    else:
+        scraper = GoogleScholarScholarlyScaper(user_id)
+        data = asyncio.run(scraper.scrape_all_async())
     
     if data:
         # Check if total_citations is 0
         if data.get('total_citations', 0) == 0:
             print("\nSkipping save: total_citations is 0")
+            _remove_snapshot()
             print("\nSummary (not saved):")
             print(f"Name: {data.get('name', 'N/A')}")
             print(f"Affiliation: {data.get('affiliation', 'N/A')}")
@@ -494,9 +952,11 @@ def main():
             print(f"Publications: {len(data.get('publications', []))}")
         else:
             # Output to JSON file
-            output_file = 'gs_data.json'
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            output_file = OUTPUT_FILE
+            _write_json(output_file, data)
+            
+            # The final output supersedes any intermediate snapshot
+            _remove_snapshot()
             
             print(f"Final data saved to {output_file}")
             